@@ -0,0 +1,66 @@
+"""Fused Numba kernel for token filtering and quality scoring.
+
+Computes the filter verdict and quality score for every token in one
+parallel pass over the column arrays, with no NumPy temporaries.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+# Verdict codes: which check a token failed first (0 = passed everything)
+PASS = 0
+REJECT_MARKET_CAP = 1
+REJECT_VOLUME = 2
+REJECT_AGE = 3
+REJECT_VOLATILITY = 4
+REJECT_QUALITY = 5
+
+
+@njit(cache=True, parallel=True, error_model='numpy')
+def score_and_filter(mcap, volume, pct_1h, pct_24h, pct_7d, pairs, age,
+                     min_cap, max_cap, min_volume, min_age,
+                     lim_1h, lim_24h, lim_7d, min_pairs, ideal_ratio,
+                     min_quality_score):
+    """Return (verdict, scores) arrays for the given token columns.
+
+    Scores are computed for every token so quality rejections can be
+    attributed; verdict records the first failing filter check, mirroring
+    the order of the sequential initial_token_filter.
+    """
+    n = mcap.shape[0]
+    scores = np.empty(n, dtype=np.float64)
+    verdict = np.zeros(n, dtype=np.int8)
+
+    for i in prange(n):
+        m = mcap[i]
+        v = volume[i]
+
+        # Quality score: five 0-20 components
+        score = min(20.0, (m / max_cap) * 20.0)
+        ratio = v / m
+        score += max(0.0, 20.0 * (1.0 - abs(ratio - ideal_ratio) / ideal_ratio))
+        stability = 20.0
+        if abs(pct_24h[i]) > lim_24h:
+            stability *= 0.5
+        if abs(pct_7d[i]) > lim_7d:
+            stability *= 0.5
+        score += stability
+        score += min(20.0, (pairs[i] / min_pairs) * 20.0)
+        score += min(20.0, (age[i] / min_age) * 20.0)
+        scores[i] = score
+
+        # Filter checks, first failure wins (NaN metrics fail the cap check)
+        if not (min_cap <= m <= max_cap):
+            verdict[i] = REJECT_MARKET_CAP
+        elif v < min_volume:
+            verdict[i] = REJECT_VOLUME
+        elif age[i] < min_age:
+            verdict[i] = REJECT_AGE
+        elif (abs(pct_1h[i]) > lim_1h or
+              abs(pct_24h[i]) > lim_24h or
+              abs(pct_7d[i]) > lim_7d):
+            verdict[i] = REJECT_VOLATILITY
+        elif not (score >= min_quality_score):
+            verdict[i] = REJECT_QUALITY
+
+    return verdict, scores
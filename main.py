@@ -1,35 +1,140 @@
-import requests
+import re
+import sys
+import requests_cache
+from requests.adapters import HTTPAdapter, Retry
 import logging
-from typing import List, Dict, Tuple
-from datetime import datetime
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+from dataclasses import dataclass
+from typing import Any, List, Dict, Tuple
+from datetime import datetime, date
 import numpy as np
-import json
+import orjson
 
-# Configure detailed logging
+import analyzer_kernel
+
+# Configure logging: WARNING by default, everything with --verbose.
+# Hot-loop messages use lazy %s formatting so filtered records cost nothing.
 logging.basicConfig(
-    level=logging.INFO,
+    level=logging.DEBUG if "--verbose" in sys.argv else logging.WARNING,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
         logging.StreamHandler(),
         logging.FileHandler('token_analysis.log')
     ]
 )
+logger = logging.getLogger(__name__)
 
 # API Configuration
 API_KEY = "c2fb6b8c-cd34-41cb-ad47-b685fca28a91"
 API_URL_BASE = "https://pro-api.coinmarketcap.com/v1"
 
+# Pulls the five hot USD metrics out of a quote dict in one call
+_get_usd_metrics = itemgetter(
+    "market_cap", "volume_24h",
+    "percent_change_1h", "percent_change_24h", "percent_change_7d"
+)
+
+# All scalar parameters for one risk level, frozen at init so hot paths do
+# a single lookup instead of indexing six dicts per token
+RiskParams = namedtuple("RiskParams", [
+    "min_cap", "max_cap", "min_volume", "min_age",
+    "lim_1h", "lim_24h", "lim_7d",
+    "vmc_lo", "vmc_hi", "ideal_ratio",
+    "min_quality_score", "min_pairs"
+])
+
+# Tag indicator sets, precompiled once for O(1) membership checks
+STABLECOIN_TAGS = frozenset({"stablecoin", "stablecoins"})
+STABLE_SYMBOLS = frozenset({"usd", "eur", "gbp", "usdt", "usdc", "dai", "busd", "tusd"})
+
+# Whole-word match so names like "Polkadot" don't trip on embedded "dai"/"usd"
+_STABLE_NAME_RE = re.compile(r'\b(usd|eur|gbp|usdt|usdc|dai|busd|tusd)\b', re.IGNORECASE)
+ETH_TAGS = frozenset({"ethereum", "erc-20", "erc20", "eth"})
+SOL_TAGS = frozenset({"solana", "spl", "sol"})
+UTILITY_TAGS = frozenset({"defi", "nft", "gaming", "layer-2", "governance"})
+
+def _make_chain_predicate(chain: str):
+    """Compile a chain-membership predicate once so the ingest loop carries
+    no per-token chain branching; returns None when no chain filter applies"""
+    target_chain = chain.lower() if chain else None
+    if target_chain == "ethereum":
+        native_symbol, chain_tags = "eth", ETH_TAGS
+    elif target_chain == "solana":
+        native_symbol, chain_tags = "sol", SOL_TAGS
+    else:
+        return None
+
+    def predicate(token: Dict, tag_set: frozenset) -> bool:
+        # Native coin, platform match, or chain tags
+        if token["symbol"].lower() == native_symbol:
+            return True
+        platform = token.get("platform") or {}
+        return (
+            platform.get("name", "").lower() == target_chain or
+            platform.get("symbol", "").lower() == native_symbol or
+            bool(tag_set & chain_tags)
+        )
+
+    return predicate
+
+@lru_cache(maxsize=8192)
+def _listing_date_ord(date_added: str) -> int:
+    """Ordinal day of a CMC date_added string, memoized since many tokens
+    share listing dates; age becomes a single integer subtraction"""
+    return datetime.strptime(date_added[:10], '%Y-%m-%d').toordinal()
+
+@dataclass(slots=True)
+class AnalyzedToken:
+    """Result record for a token that passed every filter; slotted so
+    thousands of records stay compact and attribute access skips the
+    dict hash lookups"""
+    name: str
+    symbol: str
+    market_cap: float
+    price: float
+    volume_24h: float
+    percent_change_24h: float
+    percent_change_7d: float
+    volume_to_mcap: float
+    quality_score: float
+    cmc_rank: Any
+    date_added: str
+    tags: tuple
+    analysis: Dict
+
 class TokenAnalyzer:
     def __init__(self, api_key: str):
         """Initialize TokenAnalyzer with configuration parameters"""
-        logging.debug("Initializing TokenAnalyzer...")
+        logger.debug("Initializing TokenAnalyzer...")
         
         self.api_key = api_key
         self.headers = {
             "X-CMC_PRO_API_KEY": api_key,
             "Accept": "application/json"
         }
-        
+
+        # Cache API responses on disk so re-runs within the TTL skip the
+        # network entirely and don't burn the rate-limited API quota
+        self.session = requests_cache.CachedSession(
+            'cmc_cache',
+            backend='sqlite',
+            expire_after=60
+        )
+        self.session.headers.update({**self.headers, "Accept-Encoding": "gzip"})
+
+        # Reuse connections across the page fetches (skips TLS handshakes)
+        # and retry transient failures with backoff
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=10,
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        )
+        self.session.mount('https://', adapter)
+
+
         # Market Cap Ranges for different risk levels
         self.risk_ranges = {
             "low": (100_000_000, 1_000_000_000),    # $100M-$1B
@@ -84,110 +189,140 @@ class TokenAnalyzer:
             "high": 45
         }
 
-    def get_all_tokens(self) -> List[Dict]:
+        # Minimum Exchange Listings
+        self.min_pairs = {
+            "low": 15,
+            "medium": 8,
+            "high": 3
+        }
+
+        # Freeze everything above into one namedtuple per risk level
+        self._params = {}
+        for level in ("low", "medium", "high"):
+            vmc_lo, vmc_hi = self.volume_mcap_limits[level]
+            volatility = self.max_volatility[level]
+            self._params[level] = RiskParams(
+                min_cap=self.risk_ranges[level][0],
+                max_cap=self.risk_ranges[level][1],
+                min_volume=self.min_volume[level],
+                min_age=self.min_age[level],
+                lim_1h=volatility["1h"],
+                lim_24h=volatility["24h"],
+                lim_7d=volatility["7d"],
+                vmc_lo=vmc_lo,
+                vmc_hi=vmc_hi,
+                ideal_ratio=(vmc_lo + vmc_hi) / 2,
+                min_quality_score=self.min_quality_score[level],
+                min_pairs=self.min_pairs[level]
+            )
+
+    def _fetch_listings_page(self, start: int, limit: int) -> List[Dict]:
+        """Fetch one page of the latest listings"""
+        params = {
+            "start": str(start),
+            "limit": limit,
+            "convert": "USD",
+            "aux": "platform,tags,date_added,circulating_supply,total_supply,max_supply,cmc_rank,num_market_pairs"
+        }
+
+        response = self.session.get(
+            f"{API_URL_BASE}/cryptocurrency/listings/latest",
+            params=params
+        )
+        response.raise_for_status()
+        # orjson parses the token body several times faster than response.json()
+        return orjson.loads(response.content)["data"]
+
+    def get_all_tokens(self, total: int = 5000, page_size: int = 2500) -> List[Dict]:
         """Fetch token data from CMC with error handling and logging"""
         try:
-            logging.info("Fetching token data from CoinMarketCap...")
-            
-            params = {
-                "start": "1",
-                "limit": 5000,
-                "convert": "USD",
-                "aux": "platform,tags,date_added,circulating_supply,total_supply,max_supply,cmc_rank,num_market_pairs"
-            }
-            
-            response = requests.get(
-                f"{API_URL_BASE}/cryptocurrency/listings/latest",
-                headers=self.headers,
-                params=params
-            )
-            response.raise_for_status()
-            data = response.json()["data"]
-            
-            logging.info(f"Successfully fetched {len(data)} tokens")
+            logger.info("Fetching token data from CoinMarketCap...")
+
+            # Download pages concurrently; the requests are pure I/O so
+            # threads overlap the network wait
+            page_starts = list(range(1, total + 1, page_size))
+            with ThreadPoolExecutor(max_workers=len(page_starts)) as executor:
+                pages = list(executor.map(
+                    lambda start: self._fetch_listings_page(start, page_size),
+                    page_starts
+                ))
+            data = [token for page in pages for token in page]
+
+            logger.info("Successfully fetched %d tokens", len(data))
             return data
-            
+
         except Exception as e:
-            logging.error(f"Error fetching tokens: {str(e)}")
+            logger.error("Error fetching tokens: %s", e)
             return []
 
-    def calculate_quality_score(self, token: Dict, risk: str) -> float:
+    def calculate_quality_score(self, token: Dict, risk: str, age_days: int) -> float:
         """Calculate token quality score with detailed criteria"""
         try:
             score = 0
-            usd_data = token["quote"]["USD"]
-            
+            market_cap, volume_24h, _, pct_24h, pct_7d = _get_usd_metrics(token["quote"]["USD"])
+            p = self._params[risk]
+
             # Market Cap Score (0-20)
-            market_cap = usd_data["market_cap"]
-            max_cap = self.risk_ranges[risk][1]
-            score += min(20, (market_cap / max_cap) * 20)
-            
+            score += min(20, (market_cap / p.max_cap) * 20)
+
             # Volume Score (0-20)
-            volume_mcap_ratio = usd_data["volume_24h"] / market_cap
-            ideal_ratio = sum(self.volume_mcap_limits[risk]) / 2
-            volume_score = 20 * (1 - abs(volume_mcap_ratio - ideal_ratio)/ideal_ratio)
+            volume_mcap_ratio = volume_24h / market_cap
+            volume_score = 20 * (1 - abs(volume_mcap_ratio - p.ideal_ratio)/p.ideal_ratio)
             score += max(0, volume_score)
-            
+
             # Price Stability Score (0-20)
-            changes = {
-                "24h": abs(usd_data["percent_change_24h"]),
-                "7d": abs(usd_data["percent_change_7d"])
-            }
             stability_score = 20
-            for period, change in changes.items():
-                if change > self.max_volatility[risk][period]:
-                    stability_score *= 0.5
+            if abs(pct_24h) > p.lim_24h:
+                stability_score *= 0.5
+            if abs(pct_7d) > p.lim_7d:
+                stability_score *= 0.5
             score += stability_score
-            
+
             # Exchange Listings Score (0-20)
-            min_pairs = {"low": 15, "medium": 8, "high": 3}
             pairs = token.get("num_market_pairs", 0)
-            score += min(20, (pairs / min_pairs[risk]) * 20)
-            
+            score += min(20, (pairs / p.min_pairs) * 20)
+
             # Age Score (0-20)
-            listing_date = datetime.strptime(token["date_added"].split('T')[0], '%Y-%m-%d')
-            age_days = (datetime.now() - listing_date).days
-            min_age = self.min_age[risk]
-            score += min(20, (age_days / min_age) * 20)
+            score += min(20, (age_days / p.min_age) * 20)
             
-            logging.debug(f"Quality score for {token['symbol']}: {score}")
+            logger.debug("Quality score for %s: %s", token["symbol"], score)
             return score
             
         except Exception as e:
-            logging.error(f"Error calculating quality score: {str(e)}")
+            logger.error("Error calculating quality score: %s", e)
             return 0
 
-    def initial_token_filter(self, token: Dict, risk: str) -> Tuple[bool, str]:
+    def initial_token_filter(self, token: Dict, risk: str, age_days: int) -> Tuple[bool, str]:
         """Initial quality filter with detailed feedback"""
         try:
-            usd_data = token["quote"]["USD"]
-            
+            market_cap, volume_24h, pct_1h, pct_24h, pct_7d = _get_usd_metrics(token["quote"]["USD"])
+            p = self._params[risk]
+
             # Exclude Stablecoins
-            if "stablecoin" in [tag.lower() for tag in token.get("tags", [])]:
+            tag_set = token.get("_tag_set")
+            if tag_set is None:
+                tag_set = {tag.lower() for tag in token.get("tags", [])}
+            if tag_set & STABLECOIN_TAGS:
                 return False, "Token identified as a stablecoin."
-            
+
             # Market Cap Check
-            market_cap = usd_data["market_cap"]
-            min_cap, max_cap = self.risk_ranges[risk]
-            if not (min_cap <= market_cap <= max_cap):
-                return False, f"Market cap ${market_cap:,.2f} outside range ${min_cap:,.2f}-${max_cap:,.2f}"
+            if not (p.min_cap <= market_cap <= p.max_cap):
+                return False, f"Market cap ${market_cap:,.2f} outside range ${p.min_cap:,.2f}-${p.max_cap:,.2f}"
 
             # Volume Check
-            volume_24h = usd_data["volume_24h"]
-            if volume_24h < self.min_volume[risk]:
-                return False, f"Volume ${volume_24h:,.2f} below minimum ${self.min_volume[risk]:,.2f}"
+            if volume_24h < p.min_volume:
+                return False, f"Volume ${volume_24h:,.2f} below minimum ${p.min_volume:,.2f}"
 
             # Age Check
-            listing_date = datetime.strptime(token["date_added"].split('T')[0], '%Y-%m-%d')
-            age_days = (datetime.now() - listing_date).days
-            if age_days < self.min_age[risk]:
-                return False, f"Age {age_days} days below minimum {self.min_age[risk]}"
+            if age_days < p.min_age:
+                return False, f"Age {age_days} days below minimum {p.min_age}"
 
             # Volatility Check
-            for timeframe in ["1h", "24h", "7d"]:
-                change = abs(usd_data.get(f"percent_change_{timeframe}", 0))
-                if change > self.max_volatility[risk][timeframe]:
-                    return False, f"{timeframe} change {change:.2f}% exceeds limit {self.max_volatility[risk][timeframe]}%"
+            checks = (("1h", pct_1h, p.lim_1h), ("24h", pct_24h, p.lim_24h), ("7d", pct_7d, p.lim_7d))
+            for timeframe, pct, limit in checks:
+                change = abs(pct or 0)
+                if change > limit:
+                    return False, f"{timeframe} change {change:.2f}% exceeds limit {limit}%"
 
             return True, "Passed initial filter"
             
@@ -201,8 +336,7 @@ class TokenAnalyzer:
             
             # Calculate metrics
             volume_mcap = usd_data["volume_24h"] / usd_data["market_cap"]
-            listing_date = datetime.strptime(token["date_added"].split('T')[0], '%Y-%m-%d')
-            age_days = (datetime.now() - listing_date).days
+            age_days = date.today().toordinal() - _listing_date_ord(token["date_added"])
             
             strengths = []
             weaknesses = []
@@ -217,7 +351,7 @@ class TokenAnalyzer:
                 strengths.append(f"Well-established ({age_days/365:.1f} years old)")
             
             # Volume Analysis
-            if volume_mcap >= self.volume_mcap_limits[risk][0]:
+            if volume_mcap >= self._params[risk].vmc_lo:
                 strengths.append(f"Healthy trading volume ({volume_mcap*100:.1f}% of market cap)")
             else:
                 weaknesses.append("Lower than ideal trading volume")
@@ -229,9 +363,10 @@ class TokenAnalyzer:
                 risks.append(f"Negative 7-day trend ({usd_data['percent_change_7d']:.1f}%)")
             
             # Utility Analysis
-            tags = [t.lower() for t in token.get("tags", [])]
-            utility_tags = ["defi", "nft", "gaming", "layer-2", "governance"]
-            token_utilities = [t for t in tags if t in utility_tags]
+            tag_set = token.get("_tag_set")
+            if tag_set is None:
+                tag_set = {t.lower() for t in token.get("tags", [])}
+            token_utilities = sorted(tag_set & UTILITY_TAGS)
             
             if token_utilities:
                 strengths.append(f"Clear utility: {', '.join(token_utilities)}")
@@ -246,7 +381,7 @@ class TokenAnalyzer:
             }
             
         except Exception as e:
-            logging.error(f"Error in investment analysis: {str(e)}")
+            logger.error("Error in investment analysis: %s", e)
             return {
                 "strengths": [],
                 "weaknesses": [],
@@ -254,81 +389,146 @@ class TokenAnalyzer:
                 "risks": []
             }
 
-    def analyze_tokens(self, tokens: List[Dict], risk: str) -> List[Dict]:
+    def _build_arrays(self, tokens: List[Dict], chain: str = None) -> Tuple[List[Dict], Dict[str, np.ndarray], Dict[str, int]]:
+        """Single pass over tokens: screen stablecoins and chain membership,
+        extract surviving metrics into parallel NumPy arrays"""
+        valid_tokens = []
+        market_cap, volume_24h = [], []
+        pct_1h, pct_24h, pct_7d = [], [], []
+        age_days, num_pairs = [], []
+        stats = {"stablecoins": 0, "wrong_chain": 0, "errors": 0}
+        today_ord = date.today().toordinal()
+
+        # Compile the chain predicate once, not per token
+        on_chain = _make_chain_predicate(chain)
+
+        for token in tokens:
+            try:
+                # Lowercase tags exactly once; downstream consumers reuse the set
+                tag_set = frozenset(t.lower() for t in token.get("tags", []))
+                token["_tag_set"] = tag_set
+
+                # Skip stablecoins before they touch the analysis path
+                if is_stablecoin(token, tag_set):
+                    stats["stablecoins"] += 1
+                    continue
+
+                # Chain membership
+                if on_chain is not None and not on_chain(token, tag_set):
+                    stats["wrong_chain"] += 1
+                    continue
+
+                mcap, volume, p1h, p24h, p7d = _get_usd_metrics(token["quote"]["USD"])
+
+                market_cap.append(mcap if mcap is not None else np.nan)
+                volume_24h.append(volume if volume is not None else np.nan)
+                pct_1h.append(p1h or 0.0)
+                pct_24h.append(p24h or 0.0)
+                pct_7d.append(p7d or 0.0)
+                age_days.append(today_ord - _listing_date_ord(token["date_added"]))
+                num_pairs.append(token.get("num_market_pairs") or 0)
+                valid_tokens.append(token)
+
+            except Exception as e:
+                logger.error("Error extracting token data: %s", e)
+                stats["errors"] += 1
+                continue
+
+        arrays = {
+            "market_cap": np.asarray(market_cap, dtype=np.float64),
+            "volume_24h": np.asarray(volume_24h, dtype=np.float64),
+            "pct_1h": np.asarray(pct_1h, dtype=np.float64),
+            "pct_24h": np.asarray(pct_24h, dtype=np.float64),
+            "pct_7d": np.asarray(pct_7d, dtype=np.float64),
+            "age_days": np.asarray(age_days, dtype=np.float64),
+            "num_pairs": np.asarray(num_pairs, dtype=np.float64)
+        }
+        return valid_tokens, arrays, stats
+
+    def analyze_tokens(self, tokens: List[Dict], risk: str, chain: str = None) -> List["AnalyzedToken"]:
         """Analyze and filter tokens with detailed statistics"""
         analyzed_tokens = []
+
+        logger.info("\nAnalyzing %d tokens...", len(tokens))
+
+        # Extract token metrics into columns so the filters and score formulas
+        # run as a handful of array operations instead of per-token Python.
+        # Stablecoin and chain screening happen in the same pass.
+        valid_tokens, arrays, stats = self._build_arrays(tokens, chain)
+        if chain:
+            print(f"Found {len(valid_tokens)} tokens for {chain} (excluded {stats['stablecoins']} stablecoins), analyzing...")
+        mcap = arrays["market_cap"]
+        volume = arrays["volume_24h"]
+        pct_1h, pct_24h, pct_7d = arrays["pct_1h"], arrays["pct_24h"], arrays["pct_7d"]
+        age = arrays["age_days"]
+        pairs = arrays["num_pairs"]
+
+        p = self._params[risk]
+
+        # Filters and quality scores in one fused parallel kernel pass
+        verdict, scores = analyzer_kernel.score_and_filter(
+            mcap, volume, pct_1h, pct_24h, pct_7d, pairs, age,
+            float(p.min_cap), float(p.max_cap), float(p.min_volume), float(p.min_age),
+            p.lim_1h, p.lim_24h, p.lim_7d,
+            float(p.min_pairs), p.ideal_ratio, float(p.min_quality_score)
+        )
+        keep = verdict == analyzer_kernel.PASS
+
         rejected_counts = {
-            "market_cap": 0,
-            "volume": 0,
-            "age": 0,
-            "volatility": 0,
-            "quality_score": 0,
-            "other": 0
+            "market_cap": int(np.count_nonzero(verdict == analyzer_kernel.REJECT_MARKET_CAP)),
+            "volume": int(np.count_nonzero(verdict == analyzer_kernel.REJECT_VOLUME)),
+            "age": int(np.count_nonzero(verdict == analyzer_kernel.REJECT_AGE)),
+            "volatility": int(np.count_nonzero(verdict == analyzer_kernel.REJECT_VOLATILITY)),
+            "quality_score": int(np.count_nonzero(verdict == analyzer_kernel.REJECT_QUALITY)),
+            "other": stats["stablecoins"] + stats["errors"]
         }
-        
-        logging.info(f"\nAnalyzing {len(tokens)} tokens...")
-        
-        for token in tokens:
+
+        # Rank survivors by score with one argsort instead of sorting dicts
+        keep_idx = np.flatnonzero(keep)
+        keep_idx = keep_idx[np.argsort(-scores[keep_idx], kind='stable')]
+
+        # Only touch the original dicts for the surviving tokens
+        for i in keep_idx:
             try:
-                # Initial filter
-                passed, reason = self.initial_token_filter(token, risk)
-                if not passed:
-                    if "market cap" in reason.lower():
-                        rejected_counts["market_cap"] += 1
-                    elif "volume" in reason.lower():
-                        rejected_counts["volume"] += 1
-                    elif "age" in reason.lower():
-                        rejected_counts["age"] += 1
-                    elif "change" in reason.lower():
-                        rejected_counts["volatility"] += 1
-                    elif "stablecoin" in reason.lower():
-                        rejected_counts["other"] += 1
-                    else:
-                        rejected_counts["other"] += 1
-                    continue
-                
-                # Quality score check
-                quality_score = self.calculate_quality_score(token, risk)
-                if quality_score < self.min_quality_score[risk]:
-                    rejected_counts["quality_score"] += 1
-                    continue
-                
-                # Create analyzed token data
-                analyzed_token = {
-                    "name": token["name"],
-                    "symbol": token["symbol"],
-                    "market_cap": token["quote"]["USD"]["market_cap"],
-                    "price": token["quote"]["USD"]["price"],
-                    "volume_24h": token["quote"]["USD"]["volume_24h"],
-                    "percent_change_24h": token["quote"]["USD"]["percent_change_24h"],
-                    "percent_change_7d": token["quote"]["USD"]["percent_change_7d"],
-                    "volume_to_mcap": token["quote"]["USD"]["volume_24h"] / token["quote"]["USD"]["market_cap"],
-                    "quality_score": quality_score,
-                    "cmc_rank": token.get("cmc_rank", "N/A"),
-                    "date_added": token["date_added"].split("T")[0],
-                    "tags": token.get("tags", []),
-                    "analysis": self.get_investment_rating(token, risk)
-                }
-                
+                token = valid_tokens[i]
+                usd_data = token["quote"]["USD"]
+                analyzed_token = AnalyzedToken(
+                    name=token["name"],
+                    symbol=token["symbol"],
+                    market_cap=usd_data["market_cap"],
+                    price=usd_data["price"],
+                    volume_24h=usd_data["volume_24h"],
+                    percent_change_24h=usd_data["percent_change_24h"],
+                    percent_change_7d=usd_data["percent_change_7d"],
+                    volume_to_mcap=usd_data["volume_24h"] / usd_data["market_cap"],
+                    quality_score=float(scores[i]),
+                    cmc_rank=token.get("cmc_rank", "N/A"),
+                    date_added=token["date_added"].split("T")[0],
+                    tags=tuple(token.get("tags") or ()),
+                    analysis=self.get_investment_rating(token, risk)
+                )
+
                 analyzed_tokens.append(analyzed_token)
-                
+
             except Exception as e:
-                logging.error(f"Error analyzing token: {str(e)}")
+                logger.error("Error analyzing token: %s", e)
                 rejected_counts["other"] += 1
                 continue
-        
-        # Print rejection statistics
-        print("\nFiltering Statistics:")
-        print(f"Total tokens analyzed: {len(tokens)}")
-        print(f"Rejected due to market cap: {rejected_counts['market_cap']}")
-        print(f"Rejected due to volume: {rejected_counts['volume']}")
-        print(f"Rejected due to age: {rejected_counts['age']}")
-        print(f"Rejected due to volatility: {rejected_counts['volatility']}")
-        print(f"Rejected due to quality score: {rejected_counts['quality_score']}")
-        print(f"Rejected due to other reasons: {rejected_counts['other']}")
-        print(f"Tokens passing all criteria: {len(analyzed_tokens)}")
-        
-        return sorted(analyzed_tokens, key=lambda x: x["quality_score"], reverse=True)
+
+        # Print rejection statistics in one buffered write
+        sys.stdout.write(
+            "\nFiltering Statistics:\n"
+            f"Total tokens analyzed: {len(tokens)}\n"
+            f"Rejected due to market cap: {rejected_counts['market_cap']}\n"
+            f"Rejected due to volume: {rejected_counts['volume']}\n"
+            f"Rejected due to age: {rejected_counts['age']}\n"
+            f"Rejected due to volatility: {rejected_counts['volatility']}\n"
+            f"Rejected due to quality score: {rejected_counts['quality_score']}\n"
+            f"Rejected due to other reasons: {rejected_counts['other']}\n"
+            f"Tokens passing all criteria: {len(analyzed_tokens)}\n"
+        )
+
+        return analyzed_tokens
 
 def format_price(price: float) -> str:
     """Format price with scientific notation for very small numbers"""
@@ -341,201 +541,147 @@ def format_price(price: float) -> str:
     else:
         return f"${price:.8f}"
 
-def print_token_info(token: Dict):
+def print_token_info(token: AnalyzedToken):
     """Print detailed token analysis with improved price formatting"""
-    print(f"\n{'='*60}")
-    print(f"{token['name']} ({token['symbol']})")
-    print(f"{'='*60}")
-    
-    print(f"💰 Market Cap: ${token['market_cap']:,.2f}")
-    print(f"💲 Price: {format_price(token['price'])}")
-    print(f"📊 24h Volume: ${token['volume_24h']:,.2f}")
-    print(f"📈 24h Change: {token['percent_change_24h']:+.2f}%")
-    print(f"📈 7d Change: {token['percent_change_7d']:+.2f}%")
-    print(f"📊 Quality Score: {token['quality_score']:.2f}/100")
-    print(f"🔄 Volume/MCap Ratio: {token['volume_to_mcap']:.4f}")
-    print(f"🏆 CMC Rank: #{token['cmc_rank']}")
-    print(f"📅 Listed: {token['date_added']}")
-    
-    if token['tags']:
-        print(f"🏷️ Tags: {', '.join(token['tags'][:5])}")
-    
-    analysis = token["analysis"]
-    print("\n📈 Investment Analysis:")
-    
+    # Accumulate the lines and flush them through stdout once
+    lines = [
+        f"\n{'='*60}",
+        f"{token.name} ({token.symbol})",
+        f"{'='*60}",
+        f"💰 Market Cap: ${token.market_cap:,.2f}",
+        f"💲 Price: {format_price(token.price)}",
+        f"📊 24h Volume: ${token.volume_24h:,.2f}",
+        f"📈 24h Change: {token.percent_change_24h:+.2f}%",
+        f"📈 7d Change: {token.percent_change_7d:+.2f}%",
+        f"📊 Quality Score: {token.quality_score:.2f}/100",
+        f"🔄 Volume/MCap Ratio: {token.volume_to_mcap:.4f}",
+        f"🏆 CMC Rank: #{token.cmc_rank}",
+        f"📅 Listed: {token.date_added}"
+    ]
+
+    if token.tags:
+        lines.append(f"🏷️ Tags: {', '.join(token.tags[:5])}")
+
+    analysis = token.analysis
+    lines.append("\n📈 Investment Analysis:")
+
     if analysis["strengths"]:
-        print("\n💪 Strengths:")
+        lines.append("\n💪 Strengths:")
         for strength in analysis["strengths"]:
-            print(f"  ✓ {strength}")
-    
+            lines.append(f"  ✓ {strength}")
+
     if analysis["weaknesses"]:
-        print("\n⚠️ Weaknesses:")
+        lines.append("\n⚠️ Weaknesses:")
         for weakness in analysis["weaknesses"]:
-            print(f"  • {weakness}")
-    
+            lines.append(f"  • {weakness}")
+
     if analysis["opportunities"]:
-        print("\n🎯 Opportunities:")
+        lines.append("\n🎯 Opportunities:")
         for opportunity in analysis["opportunities"]:
-            print(f"  ✓ {opportunity}")
-    
+            lines.append(f"  ✓ {opportunity}")
+
     if analysis["risks"]:
-        print("\n⚠️ Risks:")
+        lines.append("\n⚠️ Risks:")
         for risk in analysis["risks"]:
-            print(f"  • {risk}")
-def log_recommendations(tokens: List[Dict], chain: str, risk: str):
-    """Log token recommendations with timestamp and details"""
-    try:
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        filename = f"token_recommendations_{timestamp}.txt"
-        
-        with open(filename, "w") as f:
-            # Write header
-            f.write(f"Token Analysis Results - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Blockchain: {chain}\n")
-            f.write(f"Risk Level: {risk.capitalize()}\n")
-            f.write("="*80 + "\n\n")
-            
-            # Write each token's details
-            for idx, token in enumerate(tokens, 1):
-                f.write(f"#{idx} {token['name']} ({token['symbol']})\n")
-                f.write(f"Price: {format_price(token['price'])}\n")
-                f.write(f"Market Cap: ${token['market_cap']:,.2f}\n")
-                f.write(f"24h Volume: ${token['volume_24h']:,.2f}\n")
-                f.write(f"24h Change: {token['percent_change_24h']:+.2f}%\n")
-                f.write(f"7d Change: {token['percent_change_7d']:+.2f}%\n")
-                f.write(f"Quality Score: {token['quality_score']:.2f}\n")
-                f.write(f"CMC Rank: #{token['cmc_rank']}\n")
-                f.write(f"Listed Date: {token['date_added']}\n")
-                
-                if token.get('tags'):
-                    f.write(f"Tags: {', '.join(token['tags'][:5])}\n")
-                
-                # Write analysis
-                analysis = token['analysis']
-                if analysis['strengths']:
-                    f.write("\nStrengths:\n")
-                    for strength in analysis['strengths']:
-                        f.write(f"✓ {strength}\n")
-                        
-                if analysis['weaknesses']:
-                    f.write("\nWeaknesses:\n")
-                    for weakness in analysis['weaknesses']:
-                        f.write(f"• {weakness}\n")
-                        
-                if analysis['opportunities']:
-                    f.write("\nOpportunities:\n")
-                    for opportunity in analysis['opportunities']:
-                        f.write(f"✓ {opportunity}\n")
-                        
-                if analysis['risks']:
-                    f.write("\nRisks:\n")
-                    for risk in analysis['risks']:
-                        f.write(f"• {risk}\n")
-                
-                f.write("\n" + "-"*40 + "\n\n")
-            
-            # Write footer
-            f.write("\nNote: This analysis is for informational purposes only. Always DYOR!\n")
-            f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        print(f"\n📝 Recommendations logged to: {filename}")
-        
-    except Exception as e:
-        logging.error(f"Error logging recommendations: {str(e)}")
-        print("❌ Failed to log recommendations.")
+            lines.append(f"  • {risk}")
 
-def is_stablecoin(token: Dict) -> bool:
-    """Check if a token is a stablecoin"""
+    sys.stdout.write("\n".join(lines) + "\n")
+def is_stablecoin(token: Dict, tag_set: frozenset = None) -> bool:
+    """Check if a token is a stablecoin, cheapest and most precise checks first"""
     try:
-        # Check tags for stablecoin indicators
-        tags = [t.lower() for t in token.get("tags", [])]
-        stablecoin_tags = ["stablecoin", "stablecoins"]
-        if any(tag in tags for tag in stablecoin_tags):
+        # Tag match: one set intersection, settles the vast majority of cases
+        if tag_set is None:
+            tag_set = token.get("_tag_set")
+        if tag_set is None:
+            tag_set = {t.lower() for t in token.get("tags", [])}
+        if tag_set & STABLECOIN_TAGS:
             return True
-            
-        # Check name and symbol for common stablecoin indicators
-        name_lower = token["name"].lower()
-        symbol_lower = token["symbol"].lower()
-        stable_indicators = ["usd", "eur", "gbp", "usdt", "usdc", "dai", "busd", "tusd"]
-        
-        if any(indicator in name_lower for indicator in stable_indicators):
+
+        # Exact ticker match instead of substring scans
+        if token["symbol"].lower() in STABLE_SYMBOLS:
             return True
-            
-        if any(indicator in symbol_lower for indicator in stable_indicators):
+
+        # Fiat-pegged naming, matched on whole words
+        if _STABLE_NAME_RE.search(token["name"]):
             return True
-            
-        # Check if price is pegged (usually around $1)
-        price = token["quote"]["USD"]["price"]
-        if 0.95 <= price <= 1.05:  # Common stablecoin price range
-            volatility_30d = abs(token["quote"]["USD"].get("percent_change_30d", 0))
-            if volatility_30d < 5:  # Stablecoins typically have very low volatility
+
+        # Price-pegged heuristic, only when 30d volatility data is present
+        usd_data = token["quote"]["USD"]
+        volatility_30d = usd_data.get("percent_change_30d")
+        if volatility_30d is not None and 0.95 <= usd_data["price"] <= 1.05:
+            if abs(volatility_30d) < 5:  # Stablecoins typically have very low volatility
                 return True
-        
+
         return False
-        
+
     except Exception as e:
-        logging.error(f"Error checking stablecoin: {str(e)}")
+        logger.error("Error checking stablecoin: %s", e)
         return False
-def log_recommendations(tokens: List[Dict], chain: str, risk: str):
+def log_recommendations(tokens: List[AnalyzedToken], chain: str, risk: str):
     """Log token recommendations with timestamp and details"""
     try:
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         filename = f"token_recommendations_{timestamp}.txt"
         
-        with open(filename, "w", encoding='utf-8') as f:  # Add UTF-8 encoding
-            # Write header
-            f.write(f"Token Analysis Results - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Blockchain: {chain}\n")
-            f.write(f"Risk Level: {risk.capitalize()}\n")
-            f.write("="*80 + "\n\n")
-            
-            # Write each token's details
-            for idx, token in enumerate(tokens, 1):
-                f.write(f"#{idx} {token['name']} ({token['symbol']})\n")
-                f.write(f"Price: {format_price(token['price'])}\n")
-                f.write(f"Market Cap: ${token['market_cap']:,.2f}\n")
-                f.write(f"24h Volume: ${token['volume_24h']:,.2f}\n")
-                f.write(f"24h Change: {token['percent_change_24h']:+.2f}%\n")
-                f.write(f"7d Change: {token['percent_change_7d']:+.2f}%\n")
-                f.write(f"Quality Score: {token['quality_score']:.2f}\n")
-                f.write(f"CMC Rank: #{token['cmc_rank']}\n")
-                f.write(f"Listed Date: {token['date_added']}\n")
-                
-                if token.get('tags'):
-                    f.write(f"Tags: {', '.join(token['tags'][:5])}\n")
-                
-                # Write analysis using ASCII characters instead of special ones
-                analysis = token['analysis']
-                if analysis['strengths']:
-                    f.write("\nStrengths:\n")
-                    for strength in analysis['strengths']:
-                        f.write(f"+ {strength}\n")
-                        
-                if analysis['weaknesses']:
-                    f.write("\nWeaknesses:\n")
-                    for weakness in analysis['weaknesses']:
-                        f.write(f"- {weakness}\n")
-                        
-                if analysis['opportunities']:
-                    f.write("\nOpportunities:\n")
-                    for opportunity in analysis['opportunities']:
-                        f.write(f"+ {opportunity}\n")
-                        
-                if analysis['risks']:
-                    f.write("\nRisks:\n")
-                    for risk in analysis['risks']:
-                        f.write(f"- {risk}\n")
-                
-                f.write("\n" + "-"*40 + "\n\n")
-            
-            # Write footer
-            f.write("\nNote: This analysis is for informational purposes only. Always DYOR!\n")
-            f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
+        # Build the whole report in memory and write it with a single call
+        parts = []
+
+        # Header
+        parts.append(f"Token Analysis Results - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        parts.append(f"Blockchain: {chain}\n")
+        parts.append(f"Risk Level: {risk.capitalize()}\n")
+        parts.append("="*80 + "\n\n")
+
+        # Each token's details
+        for idx, token in enumerate(tokens, 1):
+            parts.append(f"#{idx} {token.name} ({token.symbol})\n")
+            parts.append(f"Price: {format_price(token.price)}\n")
+            parts.append(f"Market Cap: ${token.market_cap:,.2f}\n")
+            parts.append(f"24h Volume: ${token.volume_24h:,.2f}\n")
+            parts.append(f"24h Change: {token.percent_change_24h:+.2f}%\n")
+            parts.append(f"7d Change: {token.percent_change_7d:+.2f}%\n")
+            parts.append(f"Quality Score: {token.quality_score:.2f}\n")
+            parts.append(f"CMC Rank: #{token.cmc_rank}\n")
+            parts.append(f"Listed Date: {token.date_added}\n")
+
+            if token.tags:
+                parts.append(f"Tags: {', '.join(token.tags[:5])}\n")
+
+            # Analysis using ASCII characters instead of special ones
+            analysis = token.analysis
+            if analysis['strengths']:
+                parts.append("\nStrengths:\n")
+                for strength in analysis['strengths']:
+                    parts.append(f"+ {strength}\n")
+
+            if analysis['weaknesses']:
+                parts.append("\nWeaknesses:\n")
+                for weakness in analysis['weaknesses']:
+                    parts.append(f"- {weakness}\n")
+
+            if analysis['opportunities']:
+                parts.append("\nOpportunities:\n")
+                for opportunity in analysis['opportunities']:
+                    parts.append(f"+ {opportunity}\n")
+
+            if analysis['risks']:
+                parts.append("\nRisks:\n")
+                for token_risk in analysis['risks']:
+                    parts.append(f"- {token_risk}\n")
+
+            parts.append("\n" + "-"*40 + "\n\n")
+
+        # Footer
+        parts.append("\nNote: This analysis is for informational purposes only. Always DYOR!\n")
+        parts.append(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+        with open(filename, "w", encoding='utf-8') as f:
+            f.write("".join(parts))
+
         print(f"\n📝 Recommendations logged to: {filename}")
         
     except Exception as e:
-        logging.error(f"Error logging recommendations: {str(e)}")
+        logger.error("Error logging recommendations: %s", e)
         print("❌ Failed to log recommendations.")
            
 def main():
@@ -574,75 +720,9 @@ def main():
         print("❌ Failed to fetch token data. Please try again.")
         return
 
-    # Improved chain filtering
-    filtered_tokens = []
-    rejected_stablecoins = 0
-    
-    for token in all_tokens:
-        try:
-            # Skip stablecoins
-            if is_stablecoin(token):
-                rejected_stablecoins += 1
-                continue
-            
-            # Check platform
-            platform = token.get("platform", {})
-            
-            # For Ethereum tokens
-            if chain.lower() == "ethereum":
-                # Check if token is native ETH
-                if token["symbol"].lower() == "eth":
-                    filtered_tokens.append(token)
-                    continue
-                    
-                # Check if token is on Ethereum
-                if platform and (
-                    platform.get("name", "").lower() == "ethereum" or
-                    platform.get("symbol", "").lower() == "eth"
-                ):
-                    filtered_tokens.append(token)
-                    continue
-                
-                # Check tags for ERC20, etc.
-                tags = [t.lower() for t in token.get("tags", [])]
-                eth_indicators = ["ethereum", "erc-20", "erc20", "eth"]
-                if any(indicator in tags for indicator in eth_indicators):
-                    filtered_tokens.append(token)
-                    continue
-            
-            # For Solana tokens
-            elif chain.lower() == "solana":
-                # Check if token is native SOL
-                if token["symbol"].lower() == "sol":
-                    filtered_tokens.append(token)
-                    continue
-                    
-                # Check if token is on Solana
-                if platform and (
-                    platform.get("name", "").lower() == "solana" or
-                    platform.get("symbol", "").lower() == "sol"
-                ):
-                    filtered_tokens.append(token)
-                    continue
-                
-                # Check tags for SPL tokens
-                tags = [t.lower() for t in token.get("tags", [])]
-                sol_indicators = ["solana", "spl", "sol"]
-                if any(indicator in tags for indicator in sol_indicators):
-                    filtered_tokens.append(token)
-                    continue
-                    
-        except Exception as e:
-            logging.error(f"Error filtering token: {str(e)}")
-            continue
-
-    if not filtered_tokens:
-        print(f"❌ No tokens found for {chain}.")
-        return
-        
-    print(f"Found {len(filtered_tokens)} tokens for {chain} (excluded {rejected_stablecoins} stablecoins), analyzing...")
-    
-    analyzed_tokens = analyzer.analyze_tokens(filtered_tokens, risk)
+    # Chain filtering, stablecoin screening, and metric extraction are fused
+    # into a single pass over all_tokens inside analyze_tokens
+    analyzed_tokens = analyzer.analyze_tokens(all_tokens, risk, chain=chain)
     
     if analyzed_tokens:
         print(f"\n✨ Found {len(analyzed_tokens)} quality tokens matching criteria.")
@@ -664,5 +744,5 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         print("\n\nProgram terminated by user.")
     except Exception as e:
-        logging.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         print("\n❌ An error occurred. Please try again.")
\ No newline at end of file